@@ -21,17 +21,25 @@ Setup Instructions:
 """
 
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
-from typing import List, Dict, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter, ValidationError
+from typing import AsyncIterator, List, Dict, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
 import os
-from bs4 import BeautifulSoup
-import requests
+import threading
+import time
+import weakref
 
-# Uncomment these imports when implementing
-# from langchain_google_genai import ChatGoogleGenerativeAI
-# from langchain.prompts import PromptTemplate
-# from langchain.chains import LLMChain
+# prompt_templates and llm_providers load LangChain and the provider SDKs
+# lazily; BeautifulSoup and requests are imported inside scrape_wikipedia.
+# This keeps cold starts cheap for the health check and read-only routes
+# (see benchmarks/bench_startup.py).
+from prompt_templates import comprehensive_cacheable_prompt
+from llm_providers import get_context_cache, get_llm
 
 app = FastAPI(title="DeepKlarity Wiki Quiz Generator API")
 
@@ -48,6 +56,11 @@ app.add_middleware(
 class GenerateQuizRequest(BaseModel):
     url: HttpUrl
 
+class GenerateQuizzesRequest(BaseModel):
+    # Plain strings: each URL is validated on its own in generate_quiz_item,
+    # so one bad URL fails only its own line of the batch
+    urls: List[str] = Field(min_length=1)
+
 class KeyEntities(BaseModel):
     people: List[str]
     organizations: List[str]
@@ -71,6 +84,35 @@ class QuizResponse(BaseModel):
     related_topics: List[str]
 
 
+# Per-stage metrics (scrape, prompt, llm), exposed at GET /metrics.
+# Counters are summed over calls; gauges hold the latest value.
+stage_metrics: Dict[str, Dict[str, float]] = {}
+stage_gauges: Dict[str, Dict[str, float]] = {}
+# Batch work records stages from executor threads
+_metrics_lock = threading.Lock()
+
+
+def record_stage(
+    stage: str,
+    seconds: float,
+    gauges: Optional[Dict[str, float]] = None,
+    **counters: float
+) -> None:
+    """Add one call's duration and counters to a stage's totals and set its gauges"""
+    with _metrics_lock:
+        stats = stage_metrics.setdefault(stage, {"calls": 0, "total_seconds": 0.0})
+        stats["calls"] += 1
+        stats["total_seconds"] += seconds
+        for key, value in counters.items():
+            stats[key] = stats.get(key, 0) + value
+        if gauges:
+            stage_gauges.setdefault(stage, {}).update(gauges)
+
+
+# Lifetime of a provider context cache holding the static prompt prefix
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+
+
 def scrape_wikipedia(url: str) -> Dict:
     """
     Scrape Wikipedia article content using BeautifulSoup
@@ -78,8 +120,16 @@ def scrape_wikipedia(url: str) -> Dict:
     Returns:
         dict: Contains title, content, sections, etc.
     """
+    from bs4 import BeautifulSoup
+    import requests
+
+    # WIKIPEDIA_MIRROR_URL serves the same /wiki/<title> paths from another
+    # host, e.g. a local mirror or the fake server used by benchmarks/
+    mirror = os.getenv("WIKIPEDIA_MIRROR_URL")
+    fetch_url = mirror.rstrip('/') + '/wiki/' + url.split('/wiki/', 1)[1] if mirror else url
+
     try:
-        response = requests.get(url)
+        response = requests.get(fetch_url)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -113,60 +163,82 @@ def scrape_wikipedia(url: str) -> Dict:
         raise HTTPException(status_code=400, detail=f"Failed to scrape Wikipedia: {str(e)}")
 
 
-def generate_quiz_with_llm(article_data: Dict) -> QuizResponse:
+def parse_llm_json(text: str) -> Dict:
+    """Parse a JSON reply from the LLM, tolerating ```json code fences"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1].rsplit("```", 1)[0]
+    return json.loads(text)
+
+
+def record_prompt_stage(prompt, seconds: float, input_tokens_saved: int) -> None:
     """
-    Generate quiz using LLM (Gemini or other)
-    
-    This is where you'll integrate LangChain and your LLM API.
+    Record prompt building; input_tokens_saved must reflect what was actually
+    sent (prefix_tokens only when just the suffix went to the provider)
     """
-    
-    # TODO: Implement LLM integration
-    # Example prompt template:
+    record_stage(
+        "prompt",
+        seconds,
+        gauges={"prefix_tokens": prompt.prefix_tokens},
+        input_tokens_saved=input_tokens_saved
+    )
+
+
+def generate_quiz_with_llm(article_data: Dict) -> QuizResponse:
     """
-    QUIZ_GENERATION_PROMPT = 
-    You are an expert quiz generator. Based on the following Wikipedia article about {title}, 
-    generate a comprehensive quiz.
-    
-    Article Content:
-    {content}
-    
-    Article Sections:
-    {sections}
-    
-    Generate a JSON response with:
-    1. A concise summary (2-3 sentences)
-    2. Key entities (people, organizations, locations mentioned)
-    3. 5-10 quiz questions with:
-       - Question text
-       - Four options (A-D)
-       - Correct answer
-       - Difficulty level (easy/medium/hard)
-       - Brief explanation citing the relevant section
-    4. 5-10 related Wikipedia topics for further reading
+    Generate quiz using LLM (Gemini or other)
     
-    Requirements:
-    - Questions should be factual and directly answerable from the article
-    - Mix difficulty levels (easy, medium, hard)
-    - Explanations must reference specific sections
-    - Avoid questions that could lead to hallucinations
-    - Related topics should be real Wikipedia article titles
+    Calls the provider named by LLM_PROVIDER (see llm_providers.py). When
+    it is not set, mock data is returned so the template runs without an
+    API key.
     """
     
-    # Initialize LLM
-    # llm = ChatGoogleGenerativeAI(
-    #     model="gemini-pro",
-    #     google_api_key=os.getenv("GEMINI_API_KEY"),
-    #     temperature=0.3
-    # )
+    # Build the prompt. The static prefix (instructions + output schema) was
+    # rendered once at import; only the article-specific suffix is formatted here.
+    # See prompt_templates.py for the full template.
+    prompt = comprehensive_cacheable_prompt
+    start = time.perf_counter()
+    prompt_suffix = prompt.format_suffix(
+        title=article_data['title'],
+        summary=article_data['content'],
+        sections=article_data['sections'],
+        content=article_data['full_text']
+    )
+    prompt_seconds = time.perf_counter() - start
     
-    # Create prompt and chain
-    # prompt = PromptTemplate(...)
-    # chain = LLMChain(llm=llm, prompt=prompt)
-    # result = chain.run(...)
+    provider = os.getenv("LLM_PROVIDER")
+    # With a live context cache (see cache_prompt_prefixes) only the suffix is
+    # sent, saving the prefix tokens; otherwise the full prompt goes out
+    context_cache = get_context_cache(provider) if provider else None
+    cache_handle = prompt.get_cache_handle() if context_cache else None
+    record_prompt_stage(
+        prompt,
+        prompt_seconds,
+        input_tokens_saved=prompt.prefix_tokens if cache_handle is not None else 0
+    )
     
-    # Parse LLM response and return QuizResponse
+    if provider:
+        try:
+            if cache_handle is not None:
+                reply = context_cache.invoke(cache_handle, prompt_suffix, temperature=0.3)
+            else:
+                # Initialize LLM (created on first use, then reused)
+                llm = get_llm(provider, temperature=0.3)
+                reply = llm.invoke(prompt.prefix + prompt_suffix).content
+            
+            # Parse LLM response and return QuizResponse
+            quiz = parse_llm_json(reply)
+            return QuizResponse(**{
+                **quiz,
+                'id': 1,
+                'url': str(article_data['url']),
+                'title': article_data['title'],
+                'sections': article_data['sections']
+            })
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"LLM quiz generation failed: {str(e)}")
     
-    # For now, return mock data
+    # No provider configured: return mock data
     return QuizResponse(
         id=1,
         url=str(article_data['url']),
@@ -191,6 +263,145 @@ def generate_quiz_with_llm(article_data: Dict) -> QuizResponse:
     )
 
 
+# Batch generation settings. Scraping is I/O bound and can run wide; LLM calls
+# are limited by the provider's quota (the Gemini free tier allows 60 RPM).
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "8"))
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "4"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+# Unique URLs accepted per /generate-quizzes call (counted after dedupe)
+MAX_BATCH_URLS = 200
+
+
+class LLMRateLimiter:
+    """
+    Caps concurrent LLM calls and spaces their start times so that all
+    batches in this process together stay under a requests-per-minute quota.
+    """
+
+    def __init__(self, max_concurrent: int, requests_per_minute: float):
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._interval = 60.0 / requests_per_minute
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._slots.acquire()
+        try:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self._interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            # __aexit__ does not run if entering fails (e.g. the batch is
+            # cancelled while waiting), so give the slot back here
+            self._slots.release()
+            raise
+
+    async def __aexit__(self, *exc_info):
+        self._slots.release()
+
+
+# scrape_wikipedia and generate_quiz_with_llm block, so batch work runs on a
+# bounded thread pool sized for both stages
+batch_executor = ThreadPoolExecutor(max_workers=SCRAPE_CONCURRENCY + LLM_MAX_CONCURRENT)
+
+# asyncio primitives are bound to the event loop that first waits on them, so
+# the scrape semaphore and LLM limiter are created once per running loop
+_batch_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[asyncio.Semaphore, LLMRateLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_batch_limits() -> Tuple[asyncio.Semaphore, LLMRateLimiter]:
+    """The (scrape_slots, llm_limiter) pair shared by all batches on this loop"""
+    loop = asyncio.get_running_loop()
+    if loop not in _batch_limits:
+        _batch_limits[loop] = (
+            asyncio.Semaphore(SCRAPE_CONCURRENCY),
+            LLMRateLimiter(LLM_MAX_CONCURRENT, LLM_REQUESTS_PER_MINUTE)
+        )
+    return _batch_limits[loop]
+
+
+def validate_wikipedia_url(url: str) -> None:
+    """Reject URLs that are not Wikipedia articles"""
+    if 'wikipedia.org/wiki/' not in url:
+        raise HTTPException(status_code=400, detail="Invalid Wikipedia URL")
+
+
+_http_url = TypeAdapter(HttpUrl)
+
+
+def normalize_batch_url(url: str) -> str:
+    """
+    Normalize a URL the way GenerateQuizRequest would, so duplicates spelled
+    differently are processed once. Invalid URLs are returned unchanged and
+    rejected later by generate_quiz_item.
+    """
+    try:
+        return str(_http_url.validate_python(url))
+    except ValidationError:
+        return url
+
+
+async def generate_quiz_item(url: str) -> Dict:
+    """
+    Run the scrape + LLM pipeline for one URL of a batch.
+
+    Errors are returned in the result instead of raised, so one bad URL
+    does not fail the rest of the batch.
+    """
+    loop = asyncio.get_running_loop()
+    scrape_slots, llm_limiter = get_batch_limits()
+    try:
+        try:
+            _http_url.validate_python(url)
+        except ValidationError:
+            raise HTTPException(status_code=400, detail="Invalid URL")
+        validate_wikipedia_url(url)
+        
+        async with scrape_slots:
+            start = time.perf_counter()
+            article_data = await loop.run_in_executor(batch_executor, scrape_wikipedia, url)
+            record_stage("scrape", time.perf_counter() - start)
+        article_data['url'] = url
+        
+        async with llm_limiter:
+            start = time.perf_counter()
+            quiz_data = await loop.run_in_executor(batch_executor, generate_quiz_with_llm, article_data)
+            record_stage("llm", time.perf_counter() - start)
+        
+        return {"url": url, "status": "ok", "quiz": quiz_data.model_dump()}
+    except HTTPException as e:
+        return {"url": url, "status": "error", "error": e.detail}
+    except Exception as e:
+        return {"url": url, "status": "error", "error": f"Failed to generate quiz: {str(e)}"}
+
+
+@app.on_event("startup")
+async def cache_prompt_prefixes():
+    """
+    Send the static prompt prefix to the provider's context cache once.
+
+    The shipped comprehensive prefix is ~361 tokens, below the minimum of
+    every provider we know of (Gemini: 32,768), so today this returns
+    without caching and every call sends the full prompt. It takes effect
+    once the prefix grows past the provider's minimum (e.g. with more
+    few-shot examples).
+    """
+    provider = os.getenv("LLM_PROVIDER")
+    context_cache = get_context_cache(provider) if provider else None
+    prompt = comprehensive_cacheable_prompt
+    if context_cache is None or prompt.prefix_tokens < context_cache.min_tokens:
+        return
+    # Cache creation is a blocking network call; keep it off the event loop
+    await asyncio.to_thread(
+        prompt.cache_prefix, context_cache.create, PROMPT_CACHE_TTL_SECONDS
+    )
+
+
 @app.get("/")
 async def root():
     return {
@@ -215,20 +426,24 @@ async def generate_quiz(request: GenerateQuizRequest):
     url = str(request.url)
     
     # Validate Wikipedia URL
-    if 'wikipedia.org/wiki/' not in url:
-        raise HTTPException(status_code=400, detail="Invalid Wikipedia URL")
+    validate_wikipedia_url(url)
     
     # Check if URL already processed (caching)
     # cached_quiz = check_database_for_url(url)
     # if cached_quiz:
     #     return cached_quiz
     
-    # Scrape Wikipedia
-    article_data = scrape_wikipedia(url)
+    # Scrape Wikipedia (blocking I/O, so run it in the threadpool to keep
+    # the event loop free for other requests)
+    start = time.perf_counter()
+    article_data = await run_in_threadpool(scrape_wikipedia, url)
     article_data['url'] = url
+    record_stage("scrape", time.perf_counter() - start)
     
-    # Generate quiz with LLM
-    quiz_data = generate_quiz_with_llm(article_data)
+    # Generate quiz with LLM (also blocking)
+    start = time.perf_counter()
+    quiz_data = await run_in_threadpool(generate_quiz_with_llm, article_data)
+    record_stage("llm", time.perf_counter() - start)
     
     # Store in database
     # save_to_database(quiz_data)
@@ -236,6 +451,59 @@ async def generate_quiz(request: GenerateQuizRequest):
     return quiz_data
 
 
+@app.post("/generate-quizzes")
+async def generate_quizzes(request: GenerateQuizzesRequest):
+    """
+    Batch endpoint to generate quizzes for many Wikipedia URLs at once
+    
+    Duplicate URLs are processed once, and at most MAX_BATCH_URLS unique
+    URLs are accepted (422 otherwise). Articles are scraped concurrently
+    (SCRAPE_CONCURRENCY at a time) and LLM calls go through the loop's
+    LLMRateLimiter (see get_batch_limits).
+    
+    The response is newline-delimited JSON, one line per URL in completion
+    order:
+        {"url": "...", "status": "ok", "quiz": {...}}
+        {"url": "...", "status": "error", "error": "..."}
+    followed by a summary line:
+        {"status": "done", "total": 3, "succeeded": 2, "failed": 1,
+         "seconds": 12.4, "articles_per_minute": 14.5}
+    """
+    urls = list(dict.fromkeys(normalize_batch_url(url) for url in request.urls))
+    if len(urls) > MAX_BATCH_URLS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Too many URLs: {len(urls)} unique, at most {MAX_BATCH_URLS} per batch"
+        )
+    
+    async def stream_results() -> AsyncIterator[str]:
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(generate_quiz_item(url)) for url in urls]
+        succeeded = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                if result["status"] == "ok":
+                    succeeded += 1
+                yield json.dumps(result) + "\n"
+        finally:
+            # Stop outstanding work if the client disconnects mid-stream
+            for task in tasks:
+                task.cancel()
+        
+        seconds = time.perf_counter() - start
+        yield json.dumps({
+            "status": "done",
+            "total": len(urls),
+            "succeeded": succeeded,
+            "failed": len(urls) - succeeded,
+            "seconds": seconds,
+            "articles_per_minute": len(urls) / seconds * 60 if seconds else 0.0
+        }) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 @app.get("/quizzes")
 async def get_all_quizzes():
     """
@@ -256,6 +524,25 @@ async def get_quiz(quiz_id: int):
     raise HTTPException(status_code=404, detail="Quiz not found")
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Per-stage call counts, timings and counters with per-call averages
+    (e.g. input_tokens_saved_per_call for the prompt stage), plus the latest
+    value of each gauge (e.g. prefix_tokens)
+    """
+    report = {}
+    with _metrics_lock:
+        for stage, stats in stage_metrics.items():
+            calls = stats["calls"] or 1
+            report[stage] = dict(stats)
+            for key, value in stats.items():
+                if key != "calls":
+                    report[stage][f"{key}_per_call"] = value / calls
+            report[stage].update(stage_gauges.get(stage, {}))
+    return report
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
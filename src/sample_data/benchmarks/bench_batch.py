@@ -0,0 +1,107 @@
+"""
+Batch Benchmark: /generate-quizzes throughput against local fakes
+DeepKlarity Technologies - AI Wiki Quiz Generator
+
+Replaces scrape_wikipedia and generate_quiz_with_llm with in-process fakes
+that sleep for a fixed latency (no network access), then compares:
+  - serial: one /generate-quiz call per URL, one after another
+  - batch:  a single /generate-quizzes call streaming every URL
+
+Usage:
+    python benchmarks/bench_batch.py --urls 100 --scrape-latency 0.3 --llm-latency 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend_example  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+
+def install_fakes(scrape_latency: float, llm_latency: float, error_every: int) -> None:
+    """Swap the network-bound stages of the backend for sleeping fakes"""
+    real_generate = backend_example.generate_quiz_with_llm
+
+    def fake_scrape(url: str) -> dict:
+        time.sleep(scrape_latency)
+        title = url.rsplit("/", 1)[-1]
+        if error_every and int(title.rsplit("_", 1)[-1]) % error_every == 0:
+            raise HTTPException(status_code=400, detail="Failed to scrape Wikipedia: 404")
+        paragraphs = [f"{title} paragraph {i}." for i in range(20)]
+        return {
+            "title": title,
+            "content": " ".join(paragraphs[:10]),
+            "full_text": " ".join(paragraphs),
+            "sections": ["Early life", "Career", "Legacy"],
+        }
+
+    def fake_llm(article_data: dict):
+        time.sleep(llm_latency)
+        return real_generate(article_data)
+
+    backend_example.scrape_wikipedia = fake_scrape
+    backend_example.generate_quiz_with_llm = fake_llm
+
+
+async def run_serial(urls) -> float:
+    start = time.perf_counter()
+    for url in urls:
+        try:
+            await backend_example.generate_quiz(backend_example.GenerateQuizRequest(url=url))
+        except HTTPException:
+            pass
+    return time.perf_counter() - start
+
+
+async def run_batch(urls) -> dict:
+    response = await backend_example.generate_quizzes(
+        backend_example.GenerateQuizzesRequest(urls=urls)
+    )
+    lines = [json.loads(chunk) async for chunk in response.body_iterator]
+    return lines[-1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--urls", type=int, default=50, help="unique URLs per batch")
+    parser.add_argument("--duplicates", type=int, default=10, help="extra repeated URLs in the batch")
+    parser.add_argument("--scrape-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-rpm", type=float, default=600, help="fake provider quota")
+    parser.add_argument("--error-every", type=int, default=10, help="fail every Nth URL (0 = never)")
+    parser.add_argument("--skip-serial", action="store_true")
+    args = parser.parse_args()
+
+    install_fakes(args.scrape_latency, args.llm_latency, args.error_every)
+    # Read when the batch limits are created on the benchmark's event loop
+    backend_example.LLM_REQUESTS_PER_MINUTE = args.llm_rpm
+
+    urls = [f"https://en.wikipedia.org/wiki/Article_{i}" for i in range(1, args.urls + 1)]
+    batch_urls = urls + urls[:args.duplicates]
+
+    report = {"urls": args.urls, "duplicates": args.duplicates}
+    if not args.skip_serial:
+        seconds = asyncio.run(run_serial(urls))
+        report["serial_seconds"] = seconds
+        report["serial_articles_per_minute"] = args.urls / seconds * 60
+
+    summary = asyncio.run(run_batch(batch_urls))
+    report["batch_seconds"] = summary["seconds"]
+    report["batch_articles_per_minute"] = summary["articles_per_minute"]
+    report["batch_succeeded"] = summary["succeeded"]
+    report["batch_failed"] = summary["failed"]
+    if "serial_seconds" in report:
+        report["speedup"] = report["serial_seconds"] / report["batch_seconds"]
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Load Benchmark: end-to-end throughput and latency of the backend
+DeepKlarity Technologies - AI Wiki Quiz Generator
+
+Runs `app` from backend_example.py in-process under uvicorn, backed by
+FakeWikipedia and FakeLLM (see fakes.py), and drives it with a closed-loop
+mixed workload from worker threads:
+    generate  POST /generate-quiz for a URL not requested before
+    repeat    POST /generate-quiz for one of a few hot URLs
+    list      GET  /quizzes
+    get       GET  /quiz/{id}
+
+Reports req/s, p50/p95/p99 latency (overall and per operation), error rate,
+CPU and peak memory, and exits with status 1 if:
+  - the error rate is above --max-error-rate (any status other than 200,
+    or 200/404 for `get`, counts as an error), or
+  - the baseline was recorded with a different workload config, or
+  - the baseline was recorded on this hardware and a metric regressed by
+    more than --tolerance.
+
+The load generator and fakes share the process with the server, so CPU and
+memory figures cover all three. Absolute numbers from other hardware are
+not comparable, so a baseline recorded elsewhere is reported but not gated
+on; record one for the CI machine with --update-baseline --baseline PATH.
+
+Usage:
+    python benchmarks/bench_load.py --duration 20 --concurrency 8
+    python benchmarks/bench_load.py --update-baseline    # after an intended change
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import requests  # noqa: E402
+import uvicorn  # noqa: E402
+
+from fakes import DEFAULT_CORPUS_DIR, FakeLLM, FakeWikipedia  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Responses that count as success for each operation; /quiz/{id} returns
+# 404 until the database is implemented
+EXPECTED_STATUS = {
+    "generate": {200},
+    "repeat": {200},
+    "list": {200},
+    "get": {200, 404},
+}
+
+# metric -> True if higher is better
+COMPARED_METRICS = {
+    "requests_per_second": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "cpu_seconds_per_request": False,
+    "peak_rss_mb": False,
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {"generate", "repeat", "list", "get"}
+    if unknown:
+        raise ValueError(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def machine_fingerprint() -> Dict[str, object]:
+    """Identify the hardware and runtime, so baselines are only gated on where recorded"""
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu_model": cpu_model,
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def run_workload(base_url: str, args) -> Dict[str, List]:
+    """Closed-loop load: each worker sends its next request as soon as the last returns"""
+    mix = parse_mix(args.mix)
+    operations, weights = list(mix), list(mix.values())
+    hot_urls = [f"https://en.wikipedia.org/wiki/Hot_topic_{i}" for i in range(args.hot_urls)]
+    fresh_ids = itertools.count(1)
+    results = {op: [] for op in operations}  # op -> [(latency, ok)]
+    deadline = time.perf_counter() + args.duration
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            op = rng.choices(operations, weights)[0]
+            if op == "generate":
+                call = lambda: session.post(f"{base_url}/generate-quiz", json={
+                    "url": f"https://en.wikipedia.org/wiki/Article_{next(fresh_ids)}"
+                })
+            elif op == "repeat":
+                call = lambda: session.post(f"{base_url}/generate-quiz", json={
+                    "url": rng.choice(hot_urls)
+                })
+            elif op == "list":
+                call = lambda: session.get(f"{base_url}/quizzes")
+            else:
+                call = lambda: session.get(f"{base_url}/quiz/{rng.randint(1, 100)}")
+
+            start = time.perf_counter()
+            try:
+                ok = call().status_code in EXPECTED_STATUS[op]
+            except requests.RequestException:
+                ok = False
+            results[op].append((time.perf_counter() - start, ok))
+
+    threads = [threading.Thread(target=worker, args=(args.seed + i,)) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def build_report(results: Dict[str, List], wall_seconds: float, cpu_seconds: float, args) -> Dict:
+    samples = [sample for op_samples in results.values() for sample in op_samples]
+    total = len(samples)
+    report = {
+        "config": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "hot_urls": args.hot_urls,
+            "llm_latency": args.llm_latency,
+            "llm_error_rate": args.llm_error_rate,
+            "wiki_latency": args.wiki_latency,
+        },
+        "machine": machine_fingerprint(),
+        "requests": total,
+        "requests_per_second": total / wall_seconds,
+        **latency_summary([latency for latency, _ in samples]),
+        "error_rate": sum(1 for _, ok in samples if not ok) / total if total else 0.0,
+        "cpu_utilization": cpu_seconds / wall_seconds,
+        "cpu_seconds_per_request": cpu_seconds / total if total else 0.0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "operations": {},
+    }
+    for op, op_samples in sorted(results.items()):
+        if not op_samples:
+            continue
+        report["operations"][op] = {
+            "requests": len(op_samples),
+            **latency_summary([latency for latency, _ in op_samples]),
+            "error_rate": sum(1 for _, ok in op_samples if not ok) / len(op_samples),
+        }
+    return report
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Return a description of every metric that is worse than baseline by more
+    than tolerance. A baseline with a different config is itself a failure;
+    one from different hardware is printed for reference only.
+    """
+    if baseline.get("config") != report["config"]:
+        return [
+            "baseline was recorded with a different config "
+            f"({baseline.get('config')}); rerun with the same options or --update-baseline"
+        ]
+    gated = baseline.get("machine") == report["machine"]
+    if not gated:
+        print("NOTE: baseline was recorded on different hardware; not gating on it",
+              file=sys.stderr)
+
+    regressions = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old, new = baseline.get(metric), report[metric]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        print(f"  {metric:<26} baseline {old:>10.4g}  now {new:>10.4g}  ({change:+.1%})")
+        if gated and worse > tolerance:
+            regressions.append(f"{metric} {change:+.1%} (baseline {old:.4g}, now {new:.4g})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--mix", default="generate=3,repeat=2,list=3,get=2",
+                        help="operation weights")
+    parser.add_argument("--hot-urls", type=int, default=5, help="URLs used by 'repeat'")
+    parser.add_argument("--llm-latency", default="lognormal:0.05,0.5",
+                        help="const:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--wiki-latency", default="const:0.01")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_DIR, help="directory of saved pages")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression per metric")
+    parser.add_argument("--max-error-rate", type=float, default=0.05,
+                        help="fail if more requests than this fraction are errors")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    wikipedia = FakeWikipedia(args.corpus, latency=args.wiki_latency)
+    os.environ["WIKIPEDIA_MIRROR_URL"] = wikipedia.start()
+    os.environ["LLM_PROVIDER"] = "fake"
+    # Keep the startup hook from contacting the real provider
+    os.environ.pop("GEMINI_API_KEY", None)
+
+    import backend_example
+    import llm_providers
+
+    fake_llm = FakeLLM(latency=args.llm_latency, error_rate=args.llm_error_rate)
+    llm_providers.register_provider("fake", lambda **kwargs: fake_llm)
+
+    server = start_server(backend_example.app, free_port())
+    base_url = f"http://127.0.0.1:{server.config.port}"
+    try:
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        results = run_workload(base_url, args)
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = time.process_time() - cpu_start
+    finally:
+        server.should_exit = True
+        wikipedia.stop()
+
+    report = build_report(results, wall_seconds, cpu_seconds, args)
+    print(json.dumps(report, indent=2))
+
+    if report["error_rate"] > args.max_error_rate:
+        print(f"FAIL: error rate {report['error_rate']:.1%} is above "
+              f"{args.max_error_rate:.1%}", file=sys.stderr)
+        return 1
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline", file=sys.stderr)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print("Comparison with baseline:")
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Startup Benchmark: import time and memory of the backend
+DeepKlarity Technologies - AI Wiki Quiz Generator
+
+Imports backend_example in a fresh interpreter, serves the `/` health check,
+and reports wall-clock import time, peak RSS, and whether any heavy module
+(LangChain, provider SDKs, BeautifulSoup, requests) was loaded along the way.
+
+Exits with status 1 if a budget is exceeded, so it can run as a CI step:
+    python benchmarks/bench_startup.py --runs 5 --max-import-seconds 1.5 --max-rss-mb 150
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SAMPLE_DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be loaded when a quiz is actually generated
+HEAVY_MODULES = [
+    "langchain",
+    "langchain_core",
+    "langchain_google_genai",
+    "google.generativeai",
+    "bs4",
+    "lxml",
+    "requests",
+]
+
+# Runs in the child interpreter; prints one JSON line
+_PROBE = """
+import asyncio, json, resource, sys, time
+
+start = time.perf_counter()
+import backend_example
+import_seconds = time.perf_counter() - start
+
+asyncio.run(backend_example.root())
+
+print(json.dumps({
+    "import_seconds": import_seconds,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules_loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_probe() -> dict:
+    """Import the backend once in a fresh interpreter and return its measurements"""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=SAMPLE_DATA_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float, default=1.5)
+    parser.add_argument("--max-rss-mb", type=float, default=150.0)
+    args = parser.parse_args()
+
+    samples = [run_probe() for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "import_seconds_median": statistics.median(s["import_seconds"] for s in samples),
+        "max_rss_mb_median": statistics.median(s["max_rss_mb"] for s in samples),
+        "heavy_modules_loaded": sorted({m for s in samples for m in s["heavy_modules_loaded"]}),
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if report["import_seconds_median"] > args.max_import_seconds:
+        failures.append(
+            f"import took {report['import_seconds_median']:.3f}s "
+            f"(budget {args.max_import_seconds}s)"
+        )
+    if report["max_rss_mb_median"] > args.max_rss_mb:
+        failures.append(
+            f"peak RSS {report['max_rss_mb_median']:.1f} MB "
+            f"(budget {args.max_rss_mb} MB)"
+        )
+    if report["heavy_modules_loaded"]:
+        failures.append(
+            "heavy modules loaded at startup: " + ", ".join(report["heavy_modules_loaded"])
+        )
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Local stand-ins for Wikipedia and the LLM provider, used by the benchmarks
+DeepKlarity Technologies - AI Wiki Quiz Generator
+
+FakeWikipedia serves saved pages from benchmarks/corpus/ at /wiki/<title> on
+localhost; point the backend at it with WIKIPEDIA_MIRROR_URL. Titles without
+a saved page are served from a corpus page chosen by a stable hash, with the
+heading swapped for the requested title, so any number of distinct URLs can
+be generated. To add real pages, save them as corpus/<Title>.html, e.g.:
+    curl -o corpus/Ada_Lovelace.html https://en.wikipedia.org/wiki/Ada_Lovelace
+
+FakeLLM mimics a LangChain chat model (`invoke(prompt).content`) with a
+configurable latency distribution and error rate; register it with
+llm_providers.register_provider("fake", ...) and set LLM_PROVIDER=fake.
+"""
+
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import unquote
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+_HEADING = re.compile(r'(<h1[^>]*class="firstHeading[^"]*"[^>]*>)(.*?)(</h1>)', re.S)
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Build a latency sampler (seconds) from a spec string:
+        "0.5" or "const:0.5"      always 0.5s
+        "uniform:0.2,0.8"         uniform between 0.2s and 0.8s
+        "lognormal:0.4,0.5"       log-normal with median 0.4s and sigma 0.5
+    """
+    kind, _, params = spec.partition(":")
+    if not params:
+        kind, params = "const", kind
+    values = [float(v) for v in params.split(",")]
+    if kind == "const":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class FakeWikipedia:
+    """Threaded HTTP server replaying saved Wikipedia pages on localhost"""
+
+    def __init__(self, corpus_dir: str = DEFAULT_CORPUS_DIR, latency: str = "0"):
+        self.pages = {}
+        for filename in sorted(os.listdir(corpus_dir)):
+            if filename.endswith(".html"):
+                with open(os.path.join(corpus_dir, filename), encoding="utf-8") as f:
+                    self.pages[filename[:-len(".html")]] = f.read()
+        if not self.pages:
+            raise ValueError(f"No .html pages in corpus directory {corpus_dir}")
+        self.sample_latency = parse_latency(latency)
+        self.requests_served = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def render(self, title: str) -> Optional[str]:
+        """Return the page for a title, or None for non-article paths"""
+        if not title:
+            return None
+        if title in self.pages:
+            return self.pages[title]
+        names = list(self.pages)
+        page = self.pages[names[zlib.crc32(title.encode()) % len(names)]]
+        heading = title.replace("_", " ")
+        return _HEADING.sub(lambda m: m.group(1) + heading + m.group(3), page, count=1)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Start serving on a free localhost port and return the base URL"""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(fake.sample_latency())
+                fake.requests_served += 1
+                title = unquote(self.path.split("?", 1)[0].partition("/wiki/")[2])
+                page = fake.render(title)
+                body = (page or "Not Found").encode("utf-8")
+                self.send_response(200 if page else 404)
+                self.send_header("Content-Type", "text/html; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeLLM:
+    """Chat model stand-in that returns a well-formed quiz after a sampled delay"""
+
+    def __init__(self, latency: str = "lognormal:0.4,0.5", error_rate: float = 0.0):
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.calls = 0
+
+    def invoke(self, prompt: str) -> FakeMessage:
+        self.calls += 1
+        time.sleep(self.sample_latency())
+        if random.random() < self.error_rate:
+            raise RuntimeError("Fake LLM: 503 Service Unavailable")
+
+        match = re.search(r"^ARTICLE(?: TITLE)?: (.*)$", prompt, re.M)
+        title = match.group(1) if match else "the article"
+        return FakeMessage(json.dumps({
+            "summary": f"{title} is the subject of this article.",
+            "key_entities": {
+                "people": [title],
+                "organizations": [],
+                "locations": []
+            },
+            "quiz": [
+                {
+                    "question": f"Question {i} about {title}?",
+                    "options": ["A", "B", "C", "D"],
+                    "answer": "B",
+                    "difficulty": ["easy", "medium", "hard"][i % 3],
+                    "explanation": "Stated in the introduction."
+                }
+                for i in range(1, 6)
+            ],
+            "related_topics": ["Topic 1", "Topic 2"]
+        }))
@@ -0,0 +1,141 @@
+"""
+LLM Provider Registry
+DeepKlarity Technologies - AI Wiki Quiz Generator
+
+Chat model clients are created on first use, so importing the backend (for the
+health check or read-only /quiz traffic) does not load LangChain or any
+provider SDK.
+
+Usage:
+    from llm_providers import get_llm
+    llm = get_llm("gemini", temperature=0.3)
+    response = llm.invoke(prompt)
+
+To add another provider, register a factory that does its imports inside:
+    def create_openai(**kwargs):
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(api_key=os.getenv("OPENAI_API_KEY"), **kwargs)
+
+    register_provider("openai", create_openai)
+
+Providers with a context-caching API can also register a ContextCache, which
+lets the backend upload a static prompt prefix once and send only the
+variable suffix on each call (see get_context_cache).
+"""
+
+import datetime
+import os
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+# One model setting for both plain and cached Gemini calls, so a request hits
+# the same model whether or not the context cache is alive
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
+
+
+class ContextCache(NamedTuple):
+    """A provider's context-caching capability"""
+    # Smallest prefix, in tokens, the provider accepts for caching
+    min_tokens: int
+    # (prefix, ttl_seconds) -> cache handle, or None if caching failed
+    create: Callable[[str, int], Any]
+    # (handle, suffix, **generation options) -> reply text
+    invoke: Callable[..., str]
+
+
+def _create_gemini(**kwargs) -> Any:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    options = {
+        "model": GEMINI_MODEL,
+        "google_api_key": os.getenv("GEMINI_API_KEY"),
+        "temperature": 0.3,
+    }
+    options.update(kwargs)
+    return ChatGoogleGenerativeAI(**options)
+
+
+def _create_gemini_cache(prefix: str, ttl_seconds: int) -> Optional[Any]:
+    """
+    Upload a prompt prefix to Gemini's context cache.
+
+    Needs google-generativeai>=0.7 (the version pinned in requirements.txt
+    has no caching module) and a model that supports caching, e.g.
+    GEMINI_MODEL=gemini-1.5-flash-001. Returns None when no API key is set,
+    the SDK has no caching support, or the model rejects the cache.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return None
+    try:
+        import google.generativeai as genai
+        from google.generativeai import caching
+    except ImportError:
+        return None
+    try:
+        genai.configure(api_key=api_key)
+        return caching.CachedContent.create(
+            model=f"models/{GEMINI_MODEL}",
+            contents=[prefix],
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+    except Exception:
+        return None
+
+
+def _invoke_gemini_cached(handle: Any, suffix: str, temperature: float = 0.3) -> str:
+    import google.generativeai as genai
+
+    model = genai.GenerativeModel.from_cached_content(
+        cached_content=handle,
+        generation_config={"temperature": temperature},
+    )
+    return model.generate_content(suffix).text
+
+
+PROVIDER_FACTORIES: Dict[str, Callable[..., Any]] = {
+    "gemini": _create_gemini,
+}
+
+# Gemini 1.5 models reject caches under 32,768 tokens
+PROVIDER_CONTEXT_CACHES: Dict[str, ContextCache] = {
+    "gemini": ContextCache(32768, _create_gemini_cache, _invoke_gemini_cached),
+}
+
+_clients: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Any] = {}
+
+
+def register_provider(
+    name: str,
+    factory: Callable[..., Any],
+    context_cache: Optional[ContextCache] = None,
+) -> None:
+    """Register a factory that builds a chat model client for `name`"""
+    PROVIDER_FACTORIES[name] = factory
+    if context_cache is not None:
+        PROVIDER_CONTEXT_CACHES[name] = context_cache
+    else:
+        PROVIDER_CONTEXT_CACHES.pop(name, None)
+    # Drop clients built by a previously registered factory
+    for key in [key for key in _clients if key[0] == name]:
+        del _clients[key]
+
+
+def get_llm(name: Optional[str] = None, **kwargs) -> Any:
+    """
+    Return the chat model client for a provider, creating it on first use.
+
+    Clients are reused for identical (name, kwargs) pairs. The provider
+    defaults to the LLM_PROVIDER environment variable, then "gemini".
+    """
+    name = name or os.getenv("LLM_PROVIDER", "gemini")
+    key = (name, tuple(sorted(kwargs.items())))
+    if key not in _clients:
+        if name not in PROVIDER_FACTORIES:
+            raise ValueError(f"Unknown LLM provider: {name}")
+        _clients[key] = PROVIDER_FACTORIES[name](**kwargs)
+    return _clients[key]
+
+
+def get_context_cache(name: Optional[str] = None) -> Optional[ContextCache]:
+    """The provider's context-caching capability, or None if it has none"""
+    return PROVIDER_CONTEXT_CACHES.get(name or os.getenv("LLM_PROVIDER", "gemini"))
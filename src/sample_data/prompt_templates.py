@@ -4,12 +4,17 @@ DeepKlarity Technologies - AI Wiki Quiz Generator
 
 This file contains example prompt templates for generating high-quality quizzes.
 These prompts are designed to minimize hallucination and maximize quiz quality.
+
+LangChain is not imported at module load. Templates are plain format strings
+rendered with `render_prompt()`; the LangChain PromptTemplate objects
+(`comprehensive_prompt`, `few_shot_prompt`, ...) are built on first access.
 """
 
-from langchain.prompts import PromptTemplate, ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import string
+import threading
+import time
 
 # ============================================================================
 # OUTPUT SCHEMA DEFINITIONS
@@ -38,23 +43,77 @@ class QuizOutput(BaseModel):
 
 
 # ============================================================================
-# PROMPT TEMPLATE 1: COMPREHENSIVE QUIZ GENERATION
+# TEMPLATE REGISTRY
 # ============================================================================
 
-COMPREHENSIVE_QUIZ_PROMPT = """You are an expert educational content creator specializing in quiz generation.
+class CompiledTemplate(NamedTuple):
+    """A prompt template parsed once into its format string and fields"""
+    template: str
+    input_variables: List[str]
 
-Your task is to generate a comprehensive quiz based on the following Wikipedia article.
 
-ARTICLE TITLE: {title}
+PROMPT_TEMPLATES: Dict[str, CompiledTemplate] = {}
 
-ARTICLE SUMMARY (first paragraphs):
-{summary}
+_formatter = string.Formatter()
+_langchain_prompts: Dict[str, Any] = {}
 
-ARTICLE SECTIONS:
-{sections}
 
-FULL ARTICLE CONTENT:
-{content}
+def register_template(name: str, template: str) -> CompiledTemplate:
+    """Parse a format string's fields once and add it to PROMPT_TEMPLATES"""
+    input_variables = []
+    for _, field, _, _ in _formatter.parse(template):
+        if field and field not in input_variables:
+            input_variables.append(field)
+    compiled = CompiledTemplate(template, input_variables)
+    PROMPT_TEMPLATES[name] = compiled
+    return compiled
+
+
+def render_prompt(name: str, **kwargs) -> str:
+    """Render a registered template with plain str.format (no LangChain needed)"""
+    return PROMPT_TEMPLATES[name].template.format(**kwargs)
+
+
+def get_langchain_prompt(name: str):
+    """Build the LangChain PromptTemplate for a registered template on first use"""
+    if name not in _langchain_prompts:
+        from langchain.prompts import PromptTemplate
+
+        compiled = PROMPT_TEMPLATES[name]
+        _langchain_prompts[name] = PromptTemplate(
+            input_variables=compiled.input_variables,
+            template=compiled.template
+        )
+    return _langchain_prompts[name]
+
+
+def get_output_parser():
+    """LangChain output parser for QuizOutput, imported on first use"""
+    from langchain.output_parsers import PydanticOutputParser
+
+    return PydanticOutputParser(pydantic_object=QuizOutput)
+
+
+def __getattr__(attr: str):
+    # Lazily expose comprehensive_prompt, few_shot_prompt, ... (PEP 562).
+    # Code inside this module should call render_prompt() instead, since
+    # module __getattr__ does not apply to global name lookups.
+    name = attr[:-len("_prompt")] if attr.endswith("_prompt") else None
+    if name in PROMPT_TEMPLATES:
+        return get_langchain_prompt(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
+
+
+# ============================================================================
+# PROMPT TEMPLATE 1: COMPREHENSIVE QUIZ GENERATION
+# ============================================================================
+
+# The static instructions and output schema come first so that every call
+# shares an identical prefix (see PROMPT ASSEMBLY below); the article fields
+# follow in the variable suffix.
+COMPREHENSIVE_QUIZ_PREFIX = """You are an expert educational content creator specializing in quiz generation.
+
+Your task is to generate a comprehensive quiz based on the Wikipedia article provided at the end of this prompt.
 
 IMPORTANT INSTRUCTIONS:
 1. Questions MUST be directly answerable from the article content
@@ -92,13 +151,25 @@ OUTPUT FORMAT (JSON):
   "related_topics": ["Topic 1", "Topic 2", ...]
 }}
 
+"""
+
+COMPREHENSIVE_QUIZ_SUFFIX = """ARTICLE TITLE: {title}
+
+ARTICLE SUMMARY (first paragraphs):
+{summary}
+
+ARTICLE SECTIONS:
+{sections}
+
+FULL ARTICLE CONTENT:
+{content}
+
 Generate the quiz now:
 """
 
-comprehensive_prompt = PromptTemplate(
-    input_variables=["title", "summary", "sections", "content"],
-    template=COMPREHENSIVE_QUIZ_PROMPT
-)
+COMPREHENSIVE_QUIZ_PROMPT = COMPREHENSIVE_QUIZ_PREFIX + COMPREHENSIVE_QUIZ_SUFFIX
+
+register_template("comprehensive", COMPREHENSIVE_QUIZ_PROMPT)
 
 
 # ============================================================================
@@ -135,10 +206,7 @@ Format:
 }}
 """
 
-section_focused_prompt = PromptTemplate(
-    input_variables=["title", "section_name", "section_content"],
-    template=SECTION_FOCUSED_PROMPT
-)
+register_template("section_focused", SECTION_FOCUSED_PROMPT)
 
 
 # ============================================================================
@@ -168,10 +236,7 @@ Format:
 }}
 """
 
-entity_extraction_prompt = PromptTemplate(
-    input_variables=["title", "content"],
-    template=ENTITY_EXTRACTION_PROMPT
-)
+register_template("entity_extraction", ENTITY_EXTRACTION_PROMPT)
 
 
 # ============================================================================
@@ -200,17 +265,14 @@ Format:
 }}
 """
 
-related_topics_prompt = PromptTemplate(
-    input_variables=["title", "summary", "sections"],
-    template=RELATED_TOPICS_PROMPT
-)
+register_template("related_topics", RELATED_TOPICS_PROMPT)
 
 
 # ============================================================================
 # PROMPT TEMPLATE 5: FEW-SHOT LEARNING WITH EXAMPLES
 # ============================================================================
 
-FEW_SHOT_QUIZ_PROMPT = """You are an expert quiz creator. Study these examples of high-quality quiz questions:
+FEW_SHOT_QUIZ_PREFIX = """You are an expert quiz creator. Study these examples of high-quality quiz questions:
 
 EXAMPLE 1 (Easy):
 Article: "Alan Turing"
@@ -235,17 +297,18 @@ Explanation: "The 'Career and research' section explains that Turing 'reformulat
 
 Now generate similar high-quality questions for:
 
-ARTICLE: {title}
+"""
+
+FEW_SHOT_QUIZ_SUFFIX = """ARTICLE: {title}
 CONTENT: {content}
 SECTIONS: {sections}
 
 Generate 5-10 questions following the same quality standards as the examples.
 """
 
-few_shot_prompt = PromptTemplate(
-    input_variables=["title", "content", "sections"],
-    template=FEW_SHOT_QUIZ_PROMPT
-)
+FEW_SHOT_QUIZ_PROMPT = FEW_SHOT_QUIZ_PREFIX + FEW_SHOT_QUIZ_SUFFIX
+
+register_template("few_shot", FEW_SHOT_QUIZ_PROMPT)
 
 
 # ============================================================================
@@ -279,10 +342,7 @@ Step 5: Write explanations that cite the specific section.
 Final output in JSON format:
 """
 
-chain_of_thought_prompt = PromptTemplate(
-    input_variables=["title", "content"],
-    template=CHAIN_OF_THOUGHT_PROMPT
-)
+register_template("chain_of_thought", CHAIN_OF_THOUGHT_PROMPT)
 
 
 # ============================================================================
@@ -318,9 +378,113 @@ Output format:
 }}
 """
 
-validation_prompt = PromptTemplate(
-    input_variables=["title", "content", "quiz_questions"],
-    template=VALIDATION_PROMPT
+register_template("validation", VALIDATION_PROMPT)
+
+
+# ============================================================================
+# PROMPT ASSEMBLY: CACHEABLE STATIC PREFIXES
+# ============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token) used when no provider
+    tokenizer is supplied
+    """
+    return (len(text) + 3) // 4
+
+
+class CacheablePrompt:
+    """
+    A prompt split into a static prefix and a variable suffix.
+
+    The prefix (examples, instructions, output schema) is rendered and
+    token-counted once, when the object is created, so per-call work is
+    limited to formatting the suffix.
+
+    If the provider supports context caching, upload the prefix once with
+    `cache_prefix()` and send only `format_suffix()` on each call while
+    `get_cache_handle()` returns a handle.
+    """
+
+    # Treat a cache as expired this long before its TTL runs out, so a
+    # handle is never used right as the provider drops it
+    EXPIRY_MARGIN_SECONDS = 60
+
+    def __init__(
+        self,
+        name: str,
+        prefix_template: str,
+        suffix_template: str,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+    ):
+        self.name = name
+        # Rendering with no arguments turns the escaped {{ }} into literal braces
+        self.prefix = prefix_template.format()
+        self.suffix_template = suffix_template
+        self.prefix_tokens = count_tokens(self.prefix)
+        self.cache_handle: Optional[Any] = None
+        self._cache_expires_at = 0.0
+        self._create_cache: Optional[Callable[[str, int], Any]] = None
+        self._ttl_seconds = 0
+        self._cache_lock = threading.Lock()
+
+    def format_suffix(self, **kwargs) -> str:
+        """Render only the variable part of the prompt"""
+        return self.suffix_template.format(**kwargs)
+
+    def format(self, **kwargs) -> str:
+        """Render the full prompt, for providers without context caching"""
+        return self.prefix + self.format_suffix(**kwargs)
+
+    def cache_prefix(
+        self, create_cache: Callable[[str, int], Any], ttl_seconds: int = 3600
+    ) -> Optional[Any]:
+        """
+        Upload the static prefix through a provider's context-caching API.
+
+        `create_cache` receives the rendered prefix and the TTL in seconds and
+        returns a handle for the cached content, or None if caching is not
+        available. A successfully created cache is re-created when it expires.
+        """
+        with self._cache_lock:
+            self._create_cache = create_cache
+            self._ttl_seconds = ttl_seconds
+            return self._refresh_cache()
+
+    def get_cache_handle(self) -> Optional[Any]:
+        """
+        The live cache handle, re-creating the cache if its TTL has run out.
+
+        Returns None if the prefix was never cached or could not be
+        re-created; callers must then send the full prompt.
+        """
+        with self._cache_lock:
+            if self.cache_handle is not None and time.monotonic() >= self._cache_expires_at:
+                self._refresh_cache()
+            return self.cache_handle
+
+    def _refresh_cache(self) -> Optional[Any]:
+        self.cache_handle = self._create_cache(self.prefix, self._ttl_seconds)
+        if self.cache_handle is None:
+            # Creation failed; stop retrying on every call
+            self._create_cache = None
+        else:
+            # Short TTLs keep at least half their lifetime, so a cache is not
+            # re-created on every call
+            margin = min(self.EXPIRY_MARGIN_SECONDS, self._ttl_seconds / 2)
+            self._cache_expires_at = time.monotonic() + self._ttl_seconds - margin
+        return self.cache_handle
+
+
+# Built at import time so the static prefixes are rendered once per process.
+# Both prefixes (~361 and ~350 tokens) are below every provider's minimum
+# cacheable size today, so they are sent in full on each call.
+comprehensive_cacheable_prompt = CacheablePrompt(
+    "comprehensive", COMPREHENSIVE_QUIZ_PREFIX, COMPREHENSIVE_QUIZ_SUFFIX
+)
+
+few_shot_cacheable_prompt = CacheablePrompt(
+    "few_shot", FEW_SHOT_QUIZ_PREFIX, FEW_SHOT_QUIZ_SUFFIX
 )
 
 
@@ -332,15 +496,10 @@ def example_usage():
     """
     Example of how to use these prompt templates with LangChain
     """
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    import os
+    from llm_providers import get_llm
     
-    # Initialize LLM
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-pro",
-        google_api_key=os.getenv("GEMINI_API_KEY"),
-        temperature=0.3  # Low temperature for consistency
-    )
+    # Initialize LLM (the Gemini client is imported and created on first use)
+    llm = get_llm("gemini", temperature=0.3)  # Low temperature for consistency
     
     # Example 1: Comprehensive quiz generation
     article_data = {
@@ -351,7 +510,7 @@ def example_usage():
     }
     
     # Format the prompt
-    formatted_prompt = comprehensive_prompt.format(**article_data)
+    formatted_prompt = render_prompt("comprehensive", **article_data)
     
     # Generate quiz
     response = llm.invoke(formatted_prompt)
@@ -367,12 +526,12 @@ def example_usage():
         "section_content": "During WWII, Turing worked at Bletchley Park..."
     }
     
-    formatted_section_prompt = section_focused_prompt.format(**section_data)
+    formatted_section_prompt = render_prompt("section_focused", **section_data)
     section_questions = llm.invoke(formatted_section_prompt)
     
     # Example 3: Multi-step generation with validation
     # Step 1: Generate initial quiz
-    initial_quiz = llm.invoke(comprehensive_prompt.format(**article_data))
+    initial_quiz = llm.invoke(render_prompt("comprehensive", **article_data))
     
     # Step 2: Validate the quiz
     validation_input = {
@@ -380,7 +539,7 @@ def example_usage():
         "content": article_data["content"],
         "quiz_questions": initial_quiz.content
     }
-    validation_result = llm.invoke(validation_prompt.format(**validation_input))
+    validation_result = llm.invoke(render_prompt("validation", **validation_input))
     
     return quiz_data
 
@@ -444,10 +603,14 @@ def generate_quiz_pipeline(article_data: dict):
     """
     Advanced multi-stage pipeline for high-quality quiz generation
     """
-    llm = ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.3)
+    from llm_providers import get_llm
+    import json
+    
+    llm = get_llm("gemini", temperature=0.3)
     
     # Stage 1: Extract entities
-    entities = llm.invoke(entity_extraction_prompt.format(
+    entities = llm.invoke(render_prompt(
+        "entity_extraction",
         title=article_data["title"],
         content=article_data["content"]
     ))
@@ -455,7 +618,8 @@ def generate_quiz_pipeline(article_data: dict):
     # Stage 2: Generate questions per section
     section_questions = []
     for section_name, section_content in article_data["sections"].items():
-        questions = llm.invoke(section_focused_prompt.format(
+        questions = llm.invoke(render_prompt(
+            "section_focused",
             title=article_data["title"],
             section_name=section_name,
             section_content=section_content
@@ -463,14 +627,16 @@ def generate_quiz_pipeline(article_data: dict):
         section_questions.extend(json.loads(questions.content)["questions"])
     
     # Stage 3: Generate related topics
-    topics = llm.invoke(related_topics_prompt.format(
+    topics = llm.invoke(render_prompt(
+        "related_topics",
         title=article_data["title"],
         summary=article_data["summary"],
         sections=list(article_data["sections"].keys())
     ))
     
     # Stage 4: Validate all questions
-    validation = llm.invoke(validation_prompt.format(
+    validation = llm.invoke(render_prompt(
+        "validation",
         title=article_data["title"],
         content=article_data["content"],
         quiz_questions=json.dumps(section_questions)
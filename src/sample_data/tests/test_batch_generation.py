@@ -0,0 +1,131 @@
+"""
+Tests for the /generate-quizzes batch machinery in backend_example.py
+
+Run from src/sample_data:
+    python -m pytest tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend_example  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+def test_rate_limiter_releases_slot_when_cancelled_during_wait():
+    async def scenario():
+        # 6 RPM: calls start 10s apart, so the second and third calls wait
+        limiter = backend_example.LLMRateLimiter(2, 6)
+
+        async def call():
+            async with limiter:
+                pass
+
+        await call()
+        waiting = [asyncio.create_task(call()) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        return limiter._slots._value
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_batch_runs_on_more_than_one_event_loop(monkeypatch):
+    monkeypatch.setattr(backend_example, "scrape_wikipedia", lambda url: {
+        "title": "T",
+        "content": "Intro.",
+        "full_text": "Intro. Body.",
+        "sections": ["History"],
+    })
+    monkeypatch.setattr(backend_example, "LLM_REQUESTS_PER_MINUTE", 60000)
+    # More URLs than scrape and LLM slots, so tasks wait on both primitives
+    count = backend_example.SCRAPE_CONCURRENCY + backend_example.LLM_MAX_CONCURRENT
+    urls = [f"https://en.wikipedia.org/wiki/Article_{i}" for i in range(count)]
+
+    async def batch():
+        return await asyncio.gather(*(backend_example.generate_quiz_item(url) for url in urls))
+
+    for _ in range(2):
+        results = asyncio.run(batch())
+        assert [result["status"] for result in results] == ["ok"] * len(urls)
+
+
+@pytest.fixture
+def scraped(monkeypatch):
+    """Fake scrape_wikipedia that records each URL and fails for Missing_* titles"""
+    calls = []
+
+    def fake_scrape(url):
+        calls.append(url)
+        title = url.rsplit("/", 1)[-1]
+        if title.startswith("Missing"):
+            raise HTTPException(status_code=400, detail="Failed to scrape Wikipedia: 404")
+        return {
+            "title": title,
+            "content": "Intro.",
+            "full_text": "Intro. Body.",
+            "sections": ["History"],
+        }
+
+    monkeypatch.setattr(backend_example, "scrape_wikipedia", fake_scrape)
+    monkeypatch.setattr(backend_example, "LLM_REQUESTS_PER_MINUTE", 60000)
+    monkeypatch.delenv("LLM_PROVIDER", raising=False)
+    return calls
+
+
+def post_batch(urls):
+    with TestClient(backend_example.app) as client:
+        response = client.post("/generate-quizzes", json={"urls": urls})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return response, lines
+
+
+def test_generate_quizzes_streams_per_url_results_and_summary(scraped):
+    good = "https://en.wikipedia.org/wiki/Alan_Turing"
+    missing = "https://en.wikipedia.org/wiki/Missing_page"
+    urls = [good, "https://example.com/wiki/Alan_Turing", "not a url", missing, good]
+
+    response, lines = post_batch(urls)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    *results, summary = lines
+    by_url = {result["url"]: result for result in results}
+    assert len(results) == len(by_url) == 4
+    assert by_url[good]["status"] == "ok"
+    assert by_url[good]["quiz"]["title"] == "Alan_Turing"
+    assert by_url["https://example.com/wiki/Alan_Turing"] == {
+        "url": "https://example.com/wiki/Alan_Turing",
+        "status": "error",
+        "error": "Invalid Wikipedia URL",
+    }
+    assert by_url["not a url"]["error"] == "Invalid URL"
+    assert by_url[missing]["error"] == "Failed to scrape Wikipedia: 404"
+    assert {k: summary[k] for k in ("status", "total", "succeeded", "failed")} == {
+        "status": "done", "total": 4, "succeeded": 1, "failed": 3
+    }
+    # Invalid URLs are never scraped, and the duplicate is scraped once
+    assert sorted(scraped) == [good, missing]
+
+
+def test_generate_quizzes_caps_unique_urls_after_dedupe(scraped):
+    urls = [f"https://en.wikipedia.org/wiki/Article_{i}" for i in range(150)]
+
+    response, lines = post_batch(urls + urls[:60])
+    assert response.status_code == 200
+    assert lines[-1]["total"] == 150
+    assert lines[-1]["succeeded"] == 150
+
+    too_many = [f"https://en.wikipedia.org/wiki/Article_{i}" for i in range(201)]
+    with TestClient(backend_example.app) as client:
+        response = client.post("/generate-quizzes", json={"urls": too_many})
+    assert response.status_code == 422
@@ -0,0 +1,230 @@
+"""
+Tests for prompt prefix context caching (CacheablePrompt in prompt_templates.py
+and its use in backend_example.py), with a fake provider cache
+
+Run from src/sample_data:
+    python -m pytest tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend_example  # noqa: E402
+import llm_providers  # noqa: E402
+import prompt_templates  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+ARTICLE = {
+    "url": "https://en.wikipedia.org/wiki/Alan_Turing",
+    "title": "Alan Turing",
+    "content": "Alan Turing was a mathematician.",
+    "full_text": "Alan Turing was a mathematician. He worked at Bletchley Park.",
+    "sections": ["Early life"],
+}
+
+QUIZ_REPLY = json.dumps({
+    "summary": "Alan Turing was a mathematician.",
+    "key_entities": {"people": ["Alan Turing"], "organizations": [], "locations": []},
+    "quiz": [{
+        "question": "Where did Turing work?",
+        "options": ["Bletchley Park", "Oxford", "Paris", "Rome"],
+        "answer": "Bletchley Park",
+        "difficulty": "easy",
+        "explanation": "Stated in the introduction."
+    }],
+    "related_topics": ["Enigma machine"]
+})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeCache:
+    """Stands in for a provider's create-cache call, counting uploads"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.created = []
+
+    def __call__(self, prefix: str, ttl_seconds: int):
+        if self.fail:
+            return None
+        self.created.append((prefix, ttl_seconds))
+        return f"cache-{len(self.created)}"
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatModel:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.prompts = []
+
+    def invoke(self, prompt: str) -> FakeMessage:
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("503 Service Unavailable")
+        return FakeMessage(QUIZ_REPLY)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(prompt_templates.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def prompt(monkeypatch):
+    """A fresh comprehensive prompt, so cache state does not leak between tests"""
+    prompt = prompt_templates.CacheablePrompt(
+        "comprehensive",
+        prompt_templates.COMPREHENSIVE_QUIZ_PREFIX,
+        prompt_templates.COMPREHENSIVE_QUIZ_SUFFIX,
+    )
+    monkeypatch.setattr(backend_example, "comprehensive_cacheable_prompt", prompt)
+    return prompt
+
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    """Register provider "fake" with a context cache and select it"""
+    monkeypatch.setattr(llm_providers, "PROVIDER_FACTORIES", dict(llm_providers.PROVIDER_FACTORIES))
+    monkeypatch.setattr(llm_providers, "PROVIDER_CONTEXT_CACHES",
+                        dict(llm_providers.PROVIDER_CONTEXT_CACHES))
+    monkeypatch.setenv("LLM_PROVIDER", "fake")
+    monkeypatch.setattr(backend_example, "stage_metrics", {})
+    monkeypatch.setattr(backend_example, "stage_gauges", {})
+
+    model = FakeChatModel()
+    cache = FakeCache()
+    cached_calls = []
+
+    def invoke_cached(handle, suffix, temperature=0.3):
+        cached_calls.append((handle, suffix))
+        return QUIZ_REPLY
+
+    llm_providers.register_provider(
+        "fake", lambda **kwargs: model, llm_providers.ContextCache(0, cache, invoke_cached)
+    )
+    return model, cache, cached_calls
+
+
+def test_cache_handle_is_reused_until_expiry(prompt, clock):
+    cache = FakeCache()
+    assert prompt.cache_prefix(cache, ttl_seconds=3600) == "cache-1"
+    assert cache.created == [(prompt.prefix, 3600)]
+
+    clock.now += 3600 - prompt.EXPIRY_MARGIN_SECONDS - 1
+    assert prompt.get_cache_handle() == "cache-1"
+    assert len(cache.created) == 1
+
+
+def test_expired_cache_is_recreated(prompt, clock):
+    cache = FakeCache()
+    prompt.cache_prefix(cache, ttl_seconds=3600)
+
+    clock.now += 3600 - prompt.EXPIRY_MARGIN_SECONDS
+    assert prompt.get_cache_handle() == "cache-2"
+    assert prompt.get_cache_handle() == "cache-2"
+    assert len(cache.created) == 2
+
+
+def test_short_ttl_is_not_recreated_on_every_call(prompt, clock):
+    cache = FakeCache()
+    prompt.cache_prefix(cache, ttl_seconds=30)
+
+    clock.now += 14
+    assert prompt.get_cache_handle() == "cache-1"
+    clock.now += 1
+    assert prompt.get_cache_handle() == "cache-2"
+
+
+def test_failed_cache_creation_is_not_retried(prompt, clock):
+    cache = FakeCache(fail=True)
+    assert prompt.cache_prefix(cache) is None
+
+    clock.now += 7200
+    assert prompt.get_cache_handle() is None
+
+
+def test_failed_recreation_falls_back_to_full_prompt(prompt, clock):
+    cache = FakeCache()
+    prompt.cache_prefix(cache, ttl_seconds=3600)
+    cache.fail = True
+
+    clock.now += 3600
+    assert prompt.get_cache_handle() is None
+    assert prompt.get_cache_handle() is None
+    assert len(cache.created) == 1
+
+
+def test_shipped_prefixes_are_below_gemini_cache_minimum():
+    minimum = llm_providers.PROVIDER_CONTEXT_CACHES["gemini"].min_tokens
+    assert prompt_templates.comprehensive_cacheable_prompt.prefix_tokens < minimum
+    assert prompt_templates.few_shot_cacheable_prompt.prefix_tokens < minimum
+
+
+def test_startup_hook_skips_prefix_below_provider_minimum(prompt, fake_provider, monkeypatch):
+    _, cache, _ = fake_provider
+    create, invoke = cache, llm_providers.PROVIDER_CONTEXT_CACHES["fake"].invoke
+    llm_providers.PROVIDER_CONTEXT_CACHES["fake"] = llm_providers.ContextCache(
+        prompt.prefix_tokens + 1, create, invoke
+    )
+
+    asyncio.run(backend_example.cache_prompt_prefixes())
+    assert cache.created == []
+    assert prompt.get_cache_handle() is None
+
+
+def test_cached_call_sends_suffix_and_reports_savings(prompt, fake_provider):
+    model, cache, cached_calls = fake_provider
+    asyncio.run(backend_example.cache_prompt_prefixes())
+    assert cache.created == [(prompt.prefix, backend_example.PROMPT_CACHE_TTL_SECONDS)]
+
+    quiz = backend_example.generate_quiz_with_llm(ARTICLE)
+
+    assert quiz.title == "Alan Turing"
+    assert model.prompts == []
+    [(handle, suffix)] = cached_calls
+    assert handle == "cache-1"
+    assert not suffix.startswith(prompt.prefix)
+    assert "ARTICLE TITLE: Alan Turing" in suffix
+    assert backend_example.stage_metrics["prompt"]["input_tokens_saved"] == prompt.prefix_tokens
+
+
+def test_uncached_call_sends_full_prompt_and_saves_nothing(prompt, fake_provider):
+    model, _, cached_calls = fake_provider
+
+    backend_example.generate_quiz_with_llm(ARTICLE)
+
+    assert cached_calls == []
+    [sent] = model.prompts
+    assert sent.startswith(prompt.prefix)
+    assert backend_example.stage_metrics["prompt"]["input_tokens_saved"] == 0
+    assert backend_example.stage_gauges["prompt"]["prefix_tokens"] == prompt.prefix_tokens
+
+
+def test_prompt_stage_is_recorded_when_llm_fails(prompt, fake_provider):
+    model, _, _ = fake_provider
+    model.fail = True
+
+    with pytest.raises(HTTPException) as excinfo:
+        backend_example.generate_quiz_with_llm(ARTICLE)
+
+    assert excinfo.value.status_code == 502
+    assert backend_example.stage_metrics["prompt"]["calls"] == 1